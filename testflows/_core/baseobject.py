@@ -20,7 +20,8 @@ InitArgs = namedtuple("InitArgs", "args kwargs")
 def namedtuple_with_defaults(*args, defaults=()):
     nt = namedtuple(*args)
     nt.__new__.__defaults__ = defaults
-    [setattr(nt, f"_{field}", idx) for idx, field in enumerate(nt._fields)]
+    for idx, field in enumerate(nt._fields):
+        setattr(nt, f"_{field}", idx)
     return nt
 
 def get(a, b):
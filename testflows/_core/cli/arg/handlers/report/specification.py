@@ -12,9 +12,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import io
+import os
 import re
+import sys
 import base64
-import textwrap
 
 from collections import OrderedDict
 
@@ -28,8 +30,32 @@ from testflows._core.cli.arg.handlers.report.copyright import copyright
 from testflows._core.testtype import TestType
 from testflows._core.name import basename, sep
 from testflows._core.utils.string import title as make_title
+from testflows._core.utils.text import multiline_reindent
+
+_anchor_strip_pattern = re.compile(r"[^a-zA-Z0-9-_\s]+")
+_anchor_spaces_pattern = re.compile(r"\s+")
+_template_slot_pattern = re.compile(r"%\(([^)]+)\)s")
+
+def indent_lines(text, prefix):
+    """Add prefix to all lines including whitespace-only ones."""
+    return prefix + text.replace("\n", "\n" + prefix)
+
+def compile_template(text):
+    """Split template into static parts and substitution slot names
+    so that it is parsed only once instead of on every render.
+    """
+    statics = []
+    slots = []
+    pos = 0
+    for m in _template_slot_pattern.finditer(text):
+        statics.append(text[pos:m.start()])
+        slots.append(m.group(1))
+        pos = m.end()
+    statics.append(text[pos:])
+    return statics, slots
 
 logo = '<img class="logo" src="data:image/png;base64,%(data)s" alt="logo"/>'
+logo_file = '<img class="logo" src="%(name)s" alt="logo"/>'
 testflows = '<span class="testflows-logo"></span> [<span class="logo-test">Test</span><span class="logo-flows">Flows</span>]'
 testflows_em = testflows.replace("[", "").replace("]", "")
 
@@ -56,10 +82,21 @@ Generated by {testflows} Open-Source Test Framework
 [<span class="logo-test">Test</span><span class="logo-flows">Flows</span>]: https://testflows.com
 """
 
+template_statics, template_slots = compile_template(template.strip())
+
+#: test types that may contain nested steps
+container_types = frozenset(t.name for t in TestType if t < TestType.Test)
+
 class Formatter(object):
-    def format_logo(self, data):
+    def format_logo(self, data, output_dir=None):
         if not data["company"].get("logo"):
             return ""
+        if output_dir is not None:
+            # write logo once to a sibling file instead of
+            # inlining base64-encoded image data into the report
+            with open(os.path.join(output_dir, "logo.png"), "wb") as fd:
+                fd.write(data["company"]["logo"])
+            return '\n<p>' + logo_file % {"name": "logo.png"} + "</p>\n"
         data = base64.b64encode(data["company"]["logo"]).decode("utf-8")
         return '\n<p>' + logo % {"data": data} + "</p>\n"
 
@@ -76,94 +113,103 @@ class Formatter(object):
             "</p>\n")
 
     def format_multiline(self, text, indent=None):
-        first, rest = (text.rstrip() + "\n").split("\n", 1)
-        first = first.strip()
-        if first:
-            first += "\n"
-        out = f"{first}{textwrap.dedent(rest.rstrip())}".rstrip()
-        if indent:
-            out = textwrap.indent(out, indent)
-        return out
+        return multiline_reindent(text, indent)
 
     def format_tests(self, data, toc):
-        ss = [""]
-        s = []
-        s.append("## 2. Procedures\n")
-        s.append("\n")
-        s.append("This section includes procedures for all the executed tests.\n")
-        ss.append("\n".join(s))
+        """Generate report body as a stream of chunks, one chunk per test."""
+        buf = io.StringIO()
+        buf.write("\n---\n")
+        buf.write("## 2. Procedures\n")
+        buf.write("\n\n\n")
+        buf.write("This section includes procedures for all the executed tests.\n")
+        yield buf.getvalue()
 
         def anchor(heading):
-            return re.sub(r"\s+", "-", re.sub(r"[^a-zA-Z0-9-_\s]+", "", heading.lower()))
+            return _anchor_spaces_pattern.sub("-", _anchor_strip_pattern.sub("", heading.lower()))
+
+        def add_steps(buf, test, level):
+            if not test["steps"]:
+                buf.write("\n* None")
+                return
+            stack = [(step, level) for step in reversed(test["steps"])]
+            while stack:
+                step, level = stack.pop()
+                buf.write(f"\n{'  ' * level}* **{step['keyword']}**  {step['name']}  ")
+                if step["description"]:
+                    buf.write("\n" + indent_lines(f'<div markdown="1" class="test-description">\n{step["description"].strip()}</div>', "    " * level).rstrip())
+                if step["type"] in container_types and step["steps"]:
+                    stack.extend((child, level + 1) for child in reversed(step["steps"]))
 
         for test in data["tests"]:
-            s = []
+            buf = io.StringIO()
+            buf.write("\n---\n")
 
             id = ".".join(["1" if i == 0 else str(int(p) + 1) for i, p in enumerate(test["id"].split(sep)[1:])])
-            s.append(f"### 2.{id} {test['keyword'].upper()} **{test['name']}**\n")
-            heading = s[-1].lstrip("# ").strip()
+            heading_line = f"### 2.{id} {test['keyword'].upper()} **{test['name']}**\n"
+            heading = heading_line.lstrip("# ").strip()
             name = f"{test['keyword'].upper()} {test['name']}"
-            s.append(f"**Name** `{test['path']}`\n")
+            buf.write(heading_line)
+            buf.write(f"\n**Name** `{test['path']}`\n")
 
             if test["attributes"]:
-                s.append("**Attributes**  \n")
+                buf.write("\n**Attributes**  \n")
                 for attr in test["attributes"]:
-                    s.append(f'||**{attr["attribute_name"]}**||{attr["attribute_value"]}||')
-                s.append("\n")
+                    buf.write(f'\n||**{attr["attribute_name"]}**||{attr["attribute_value"]}||')
+                buf.write("\n\n")
 
             if test["tags"]:
                 t = []
                 for tag in test["tags"]:
                     t.append(f'`{tag["tag_value"]}`')
-                s.append(f"**Tags**  {', '.join(t)}")
-                s.append("\n")
+                buf.write(f"\n**Tags**  {', '.join(t)}")
+                buf.write("\n\n")
 
             if test["description"]:
-                s.append("##### DESCRIPTION\n")
-                s.append(self.format_multiline(test['description']) if test['description'] else "")
-                s.append("\n")
+                buf.write("\n##### DESCRIPTION\n")
+                buf.write("\n" + (self.format_multiline(test['description']) if test['description'] else ""))
+                buf.write("\n\n")
 
             if test["requirements"]:
-                s.append("##### REQUIREMENTS\n")
+                buf.write("\n##### REQUIREMENTS\n")
                 for req in test["requirements"]:
-                    s.append(f'* **{req["requirement_name"]}**')
-                    s.append(textwrap.indent(f'<div markdown="1" class="text-small">\nversion: {req["requirement_version"]}</div>', "  "))
-                    s.append(textwrap.indent(f'<div markdown="1" class="test-description">\n{(req["requirement_description"] or "").strip()}</div>', "  "))
-                s.append("\n")
-
-            def add_steps(s, test, level):
-                for step in test["steps"]:
-                    s.append(f"{'  ' * level}* **{step['keyword']}**  {step['name']}  ")
-                    if step["description"]:
-                        s.append(textwrap.indent(f'<div markdown="1" class="test-description">\n{step["description"].strip()}</div>', "    " * level).rstrip())
-                    if getattr(TestType, step["type"]) < TestType.Test:
-                        if step["steps"]:
-                            add_steps(s, step, level + 1)
-                if not test["steps"]:
-                    s.append("* None")
-
-            s.append("##### PROCEDURE\n")
-            add_steps(s, test, 1)
-            s.append("\n")
-            ss.append("\n".join(s))
+                    buf.write(f'\n* **{req["requirement_name"]}**')
+                    buf.write("\n" + indent_lines(f'<div markdown="1" class="text-small">\nversion: {req["requirement_version"]}</div>', "  "))
+                    buf.write("\n" + indent_lines(f'<div markdown="1" class="test-description">\n{(req["requirement_description"] or "").strip()}</div>', "  "))
+                buf.write("\n\n")
+
+            buf.write("\n##### PROCEDURE\n")
+            add_steps(buf, test, 1)
+            buf.write("\n\n")
 
             toc.append(f"{len(id.split('.')) * '  '}* 2.{id} [{name}](#{anchor(heading)})")
 
-        return "\n---\n".join(ss)
+            yield buf.getvalue()
 
-    def format(self, data):
+    def format_stream(self, data, output_dir=None):
+        """Generate the report as a stream of chunks."""
         toc = []
         toc.append("* 1 [Overview](#1-overview)")
         toc.append("* 2 [Procedures](#2-procedures)")
-        body = self.format_tests(data, toc)
-        return template.strip() % {
+        # body chunks must be generated first as they fill in the
+        # table of contents that is emitted before the body
+        body = list(self.format_tests(data, toc))
+        subs = {
             "title": data["title"],
             "table_of_contents": "\n".join(toc),
-            "logo": self.format_logo(data),
+            "logo": self.format_logo(data, output_dir=output_dir),
             "confidential": self.format_confidential(data),
-            "copyright": self.format_copyright(data),
-            "body": body
+            "copyright": self.format_copyright(data)
         }
+        for static, slot in zip(template_statics, template_slots):
+            yield static
+            if slot == "body":
+                yield from body
+            else:
+                yield subs[slot]
+        yield template_statics[-1]
+
+    def format(self, data, output_dir=None):
+        return "".join(self.format_stream(data, output_dir=output_dir))
 
 
 class Handler(HandlerBase):
@@ -232,7 +278,7 @@ class Handler(HandlerBase):
         tests = []
         for uname, test in results["tests"].items():
             t = {}
-            if getattr(TestType, test["test"]["test_type"]) < TestType.Test:
+            if TestType.__members__[test["test"]["test_type"]] < TestType.Test:
                 continue
             tests.append(self.test(results, test["test"]))
         return tests
@@ -246,9 +292,13 @@ class Handler(HandlerBase):
 
     def generate(self, formatter, results, args):
         output = args.output
-        output.write(
-            formatter.format(self.data(results, args))
-        )
+        output_dir = None
+        if output is not sys.stdout:
+            name = getattr(output, "name", None)
+            if name and not name.startswith("<"):
+                output_dir = os.path.dirname(os.path.abspath(name))
+        for chunk in formatter.format_stream(self.data(results, args), output_dir=output_dir):
+            output.write(chunk)
         output.write("\n")
 
     def handle(self, args):
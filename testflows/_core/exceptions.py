@@ -4,9 +4,10 @@ import traceback
 def exception(exc_type=None, exc_value=None, exc_traceback=None):
     """Get exception string.
     """
-    if (exc_type, exc_value, exc_traceback) == (None, None, None):
+    if exc_type is None and exc_value is None and exc_traceback is None:
         exc_type, exc_value, exc_traceback  = sys.exc_info()
-    return "".join(traceback.format_exception(exc_type, exc_value, exc_traceback)).rstrip()
+    return "".join(traceback.TracebackException(
+        exc_type, exc_value, exc_traceback).format()).rstrip()
 
 
 class TestFlowsException(Exception):
@@ -14,6 +14,11 @@
 # limitations under the License.
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from collections import namedtuple
 
 from .utils.enum import IntEnum
@@ -69,8 +74,15 @@ MessageMap = namedtuple(
         "NODE MAP STOP SPECIFICATION PROMPT TEXT"
     )
 
-def dumps(o):
-    return json.dumps(o, separators=(",", ":"), ensure_ascii=False)
+if orjson is not None:
+    def dumps(o):
+        return orjson.dumps(o).decode("utf-8")
+
+    def loads(s):
+        return orjson.loads(s)
+else:
+    def dumps(o):
+        return json.dumps(o, separators=(",", ":"), ensure_ascii=False)
 
-def loads(s):
-    return json.loads(s)
+    def loads(s):
+        return json.loads(s)
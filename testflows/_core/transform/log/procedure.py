@@ -19,7 +19,7 @@ from testflows._core.message import Message
 from testflows._core.transform.log.short import formatters, last_message
 
 formatters = {
-    Message.TEST.name: formatters[Message.TEST.name]
+    Message.TEST.name: formatters[Message.TEST]
 }
 
 def transform():
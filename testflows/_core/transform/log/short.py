@@ -22,9 +22,18 @@ from testflows._core.testtype import TestType, TestSubType
 from testflows._core.message import Message
 from testflows._core.objects import ExamplesTable
 from testflows._core.name import split, parentname, basename
+from testflows._core.utils.text import multiline_reindent
 from testflows._core.cli.colors import color, cursor_up
 
+#: cache name parsing as the same test names repeat
+#: across messages of a log
+split = functools.lru_cache(maxsize=4096)(split)
+parentname = functools.lru_cache(maxsize=4096)(parentname)
+basename = functools.lru_cache(maxsize=4096)(basename)
+
 indent = " " * 2
+#: precomputed indents for each nesting level
+indents = tuple(indent * i for i in range(128))
 #: map of tests by name
 tests_by_id = {}
 #: map of tests by parent
@@ -32,21 +41,41 @@ tests_by_parent = {}
 #: last message
 last_message = [None]
 
+def get_indent(level):
+    """Return indentation string for the given nesting level."""
+    try:
+        return indents[level]
+    except IndexError:
+        return indent * level
+
+@functools.lru_cache(maxsize=None)
+def message_value(keyword):
+    """Resolve message keyword name into its integer value."""
+    try:
+        return Message[keyword].value
+    except KeyError:
+        return Message.NONE.value
+
+@functools.lru_cache(maxsize=256)
 def color_other(other, no_colors=False):
     return color(other, "white", attrs=["dim"], no_colors=no_colors)
 
+@functools.lru_cache(maxsize=256)
 def color_keyword(keyword, no_colors=False):
     return color(split(keyword)[-1], "white", attrs=["bold"], no_colors=no_colors)
 
+@functools.lru_cache(maxsize=256)
 def color_secondary_keyword(keyword, no_colors=False):
     return color(split(keyword)[-1], "white", attrs=["bold", "dim"], no_colors=no_colors)
 
+@functools.lru_cache(maxsize=256)
 def color_test_name(name, no_colors=False, use_full_testname=False):
     if use_full_testname:
         return color(name, "white", attrs=[], no_colors=no_colors)
     else:
         return color(split(name)[-1], "white", attrs=[], no_colors=no_colors)
 
+@functools.lru_cache(maxsize=256)
 def color_result(result, attrs=None, no_colors=False, retry=False):
     if attrs is None:
         attrs = ["bold"]
@@ -68,7 +97,7 @@ def color_result(result, attrs=None, no_colors=False, retry=False):
         raise ValueError(f"unknown result {result}")
 
 def format_input(msg, keyword, no_colors=False):
-    out = f"{indent * (msg['test_id'].count('/'))}"
+    out = f"{get_indent(msg['test_id'].count('/'))}"
     out += color("\u270b " + msg["message"], "yellow", attrs=["bold"], no_colors=no_colors) \
         + cursor_up(no_colors=no_colors) + "\n"
     return out
@@ -88,13 +117,7 @@ def format_input(msg, keyword, no_colors=False):
     return out
 
 def format_multiline(text, indent):
-    first, rest = (text.rstrip() + "\n").split("\n", 1)
-    first = first.strip()
-    if first:
-        first += "\n"
-    out = f"{first}{textwrap.dedent(rest.rstrip())}".rstrip()
-    out = textwrap.indent(out, indent + "  ")
-    return out
+    return multiline_reindent(text, indent + "  ")
 
 def format_test_description(msg, indent, no_colors=False):
     desc = format_multiline(msg["test_description"], indent)
@@ -103,9 +126,9 @@ def format_test_description(msg, indent, no_colors=False):
 
 def format_specification(msg, no_colors=False):
     out = []
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
 
-    if last_message[0] and not last_message[0]["message_keyword"] == Message.SPECIFICATION.name:
+    if last_message[0] and not message_value(last_message[0]["message_keyword"]) == Message.SPECIFICATION:
         out = [f"{_indent}{' ' * 2}{color_secondary_keyword('Specifications', no_colors=no_colors)}"]
 
     out.append(color(f"{_indent}{' ' * 4}{msg['specification_name']}", "white", attrs=["dim"], no_colors=no_colors))
@@ -115,9 +138,9 @@ def format_specification(msg, no_colors=False):
 
 def format_requirement(msg, no_colors=False):
     out = []
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
 
-    if last_message[0] and not last_message[0]["message_keyword"] == Message.REQUIREMENT.name:
+    if last_message[0] and not message_value(last_message[0]["message_keyword"]) == Message.REQUIREMENT:
         out = [f"{_indent}{' ' * 2}{color_secondary_keyword('Requirements', no_colors=no_colors)}"]
 
     out.append(color(f"{_indent}{' ' * 4}{msg['requirement_name']}", "white", attrs=["dim"], no_colors=no_colors))
@@ -126,9 +149,9 @@ def format_requirement(msg, no_colors=False):
 
 def format_attribute(msg, no_colors=False):
     out = []
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
 
-    if last_message[0] and not last_message[0]["message_keyword"] == Message.ATTRIBUTE.name:
+    if last_message[0] and not message_value(last_message[0]["message_keyword"]) == Message.ATTRIBUTE:
         out = [f"{_indent}{' ' * 2}{color_secondary_keyword('Attributes', no_colors=no_colors)}"]
 
     out.append(color(f"{_indent}{' ' * 4}{msg['attribute_name']}", "white", attrs=["dim"], no_colors=no_colors))
@@ -137,9 +160,9 @@ def format_attribute(msg, no_colors=False):
 
 def format_tag(msg, no_colors=False):
     out = []
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
 
-    if last_message[0] and not last_message[0]["message_keyword"] == Message.TAG.name:
+    if last_message[0] and not message_value(last_message[0]["message_keyword"]) == Message.TAG:
         out = [f"{_indent}{' ' * 2}{color_secondary_keyword('Tags', no_colors=no_colors)}"]
 
     out.append(color(f"{_indent}{' ' * 4}{msg['tag_value']}", "white", attrs=["dim"], no_colors=no_colors))
@@ -147,10 +170,10 @@ def format_tag(msg, no_colors=False):
 
 def format_example(msg, no_colors=False):
     out = []
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
 
     row_format = msg["example_row_format"] or ExamplesTable.default_row_format(msg["example_columns"], msg["example_values"])
-    if last_message[0] and not last_message[0]["message_keyword"] == Message.EXAMPLE.name:
+    if last_message[0] and not message_value(last_message[0]["message_keyword"]) == Message.EXAMPLE:
         out = [f"{_indent}{' ' * 2}{color_secondary_keyword('Examples', no_colors=no_colors)}"]
         out.append(color(textwrap.indent(f"{ExamplesTable.__str_header__(tuple(msg['example_columns']),row_format)}",
             prefix=f"{_indent}{' ' * 4}"), "white", attrs=["dim"], no_colors=no_colors))
@@ -161,9 +184,9 @@ def format_example(msg, no_colors=False):
 
 def format_argument(msg, no_colors=False):
     out = []
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
 
-    if last_message[0] and not last_message[0]["message_keyword"] == Message.ARGUMENT.name:
+    if last_message[0] and not message_value(last_message[0]["message_keyword"]) == Message.ARGUMENT:
         out = [f"{_indent}{' ' * 2}{color_secondary_keyword('Arguments', no_colors=no_colors)}"]
 
     out.append(color(f"{_indent}{' ' * 4}{msg['argument_name']}", "white", attrs=["dim"], no_colors=no_colors))
@@ -171,24 +194,68 @@ def format_argument(msg, no_colors=False):
         prefix=f"{_indent}{' ' * 6}"), "white", attrs=["dim"], no_colors=no_colors))
     return "\n".join(out) + "\n"
 
+#: test type and subtype members by name
+test_types = TestType.__members__
+test_subtypes = TestSubType.__members__
+
 def get_type(msg):
-    return getattr(TestType, msg["test_type"])
+    return test_types[msg["test_type"]]
 
 def get_subtype(msg):
-    return getattr(TestSubType, str(msg["test_subtype"]), 0)
+    return test_subtypes.get(str(msg["test_subtype"]), 0)
 
 def and_keyword(msg, parent_id, keyword, subtype):
     """Handle processing of Given, When, Then, But, By and Finally
     keywords and convert them to And when necessary.
     """
-    prev = tests_by_parent[parent_id][-2] if len(tests_by_parent.get(parent_id, [])) > 1 else None
+    siblings = tests_by_parent.get(parent_id)
+    len_siblings = len(siblings) if siblings else 0
+    prev = siblings[-2] if len_siblings > 1 else None
     if prev and get_subtype(prev) == subtype and tests_by_parent.get(prev["test_id"]) is None:
         keyword = "And"
     parent = tests_by_id.get(parent_id)
-    if parent and get_subtype(parent) == subtype and len(tests_by_parent.get(parent_id, [])) == 1:
+    if parent and get_subtype(parent) == subtype and len_siblings == 1:
         keyword = "And"
     return keyword
 
+#: step subtypes that may be converted to And
+and_subtype_keywords = {
+    TestSubType.Given: "Given",
+    TestSubType.When: "When",
+    TestSubType.Then: "Then",
+    TestSubType.By: "By",
+    TestSubType.But: "But",
+    TestSubType.Finally: "Finally",
+    TestSubType.Cleanup: "Cleanup",
+    TestSubType.Background: "Background",
+    TestSubType.Paragraph: "Paragraph"
+}
+
+#: keyword suffixes by test type and subtype,
+#: (type, None) entry is the default for the type
+keyword_suffixes = {
+    (TestType.Module, TestSubType.Book): "Book",
+    (TestType.Module, None): "Module",
+    (TestType.Suite, TestSubType.Feature): "Feature",
+    (TestType.Suite, TestSubType.Chapter): "Chapter",
+    (TestType.Suite, None): "Suite",
+    (TestType.Iteration, None): "Iteration",
+    (TestType.RetryIteration, None): "Retry",
+    (TestType.Step, TestSubType.And): "And",
+    (TestType.Step, None): "Step",
+    (TestType.Outline, None): "Outline",
+    (TestType.Test, TestSubType.Scenario): "Scenario",
+    (TestType.Test, TestSubType.Check): "Check",
+    (TestType.Test, TestSubType.Critical): "Critical",
+    (TestType.Test, TestSubType.Major): "Major",
+    (TestType.Test, TestSubType.Minor): "Minor",
+    (TestType.Test, TestSubType.Recipe): "Recipe",
+    (TestType.Test, TestSubType.Document): "Document",
+    (TestType.Test, TestSubType.Page): "Page",
+    (TestType.Test, TestSubType.Section): "Section",
+    (TestType.Test, None): "Test"
+}
+
 def format_test(msg, keyword, tests_by_parent, tests_by_id, no_colors=False):
     # add test to the tests map
     parent = parentname(msg["test_id"])
@@ -202,72 +269,17 @@ def format_test(msg, keyword, tests_by_parent, tests_by_id, no_colors=False):
 
     if test_subtype == TestSubType.Example:
         keyword += "Example"
-    elif test_type == TestType.Module:
-        if test_subtype == TestSubType.Book:
-            keyword += "Book"
-        else:
-            keyword += "Module"
-    elif test_type == TestType.Suite:
-        if test_subtype == TestSubType.Feature:
-            keyword += "Feature"
-        elif test_subtype == TestSubType.Chapter:
-            keyword += "Chapter"
-        else:
-            keyword += "Suite"
-    elif test_type == TestType.Iteration:
-        keyword += "Iteration"
-    elif test_type == TestType.RetryIteration:
-        keyword += "Retry"
-    elif test_type == TestType.Step:
-        if test_subtype == TestSubType.And:
-            keyword += "And"
-        elif test_subtype == TestSubType.Given:
-            keyword += and_keyword(msg, parent, "Given", TestSubType.Given)
-        elif test_subtype == TestSubType.When:
-            keyword += and_keyword(msg, parent, "When", TestSubType.When)
-        elif test_subtype == TestSubType.Then:
-            keyword += and_keyword(msg, parent, "Then", TestSubType.Then)
-        elif test_subtype == TestSubType.By:
-            keyword += and_keyword(msg, parent, "By", TestSubType.By)
-        elif test_subtype == TestSubType.But:
-            keyword += and_keyword(msg, parent, "But", TestSubType.But)
-        elif test_subtype == TestSubType.Finally:
-            keyword += and_keyword(msg, parent, "Finally", TestSubType.Finally)
-        elif test_subtype == TestSubType.Cleanup:
-            keyword += and_keyword(msg, parent, "Cleanup", TestSubType.Cleanup)
-        elif test_subtype == TestSubType.Background:
-            keyword += and_keyword(msg, parent, "Background", TestSubType.Background)
-        elif test_subtype == TestSubType.Paragraph:
-            keyword += and_keyword(msg, parent, "Paragraph", TestSubType.Paragraph)
-        else:
-            keyword += "Step"
-    elif test_type == TestType.Outline:
-        keyword += "Outline"
+    elif test_type == TestType.Step and test_subtype in and_subtype_keywords:
+        keyword += and_keyword(msg, parent, and_subtype_keywords[test_subtype], test_subtype)
     else:
-        if test_subtype == TestSubType.Scenario:
-            keyword += "Scenario"
-        elif test_subtype == TestSubType.Check:
-            keyword += "Check"
-        elif test_subtype == TestSubType.Critical:
-            keyword += "Critical"
-        elif test_subtype == TestSubType.Major:
-            keyword += "Major"
-        elif test_subtype == TestSubType.Minor:
-            keyword += "Minor"
-        elif test_subtype == TestSubType.Recipe:
-            keyword += "Recipe"
-        elif test_subtype == TestSubType.Document:
-            keyword += "Document"
-        elif test_subtype == TestSubType.Page:
-            keyword += "Page"
-        elif test_subtype == TestSubType.Section:
-            keyword += "Section"
-        else:
-            keyword += "Test"
+        suffix = keyword_suffixes.get((test_type, test_subtype))
+        if suffix is None:
+            suffix = keyword_suffixes[(test_type, None)]
+        keyword += suffix
 
     _keyword = color_keyword(keyword, no_colors=no_colors)
     _name = color_test_name(split(msg["test_name"])[-1], no_colors=no_colors)
-    _indent = indent * (msg["test_id"].count('/') - 1)
+    _indent = get_indent(msg["test_id"].count('/') - 1)
     out = f"{_indent}{_keyword} {_name}\n"
     if msg["test_description"]:
         out += format_test_description(msg, _indent, no_colors=no_colors)
@@ -285,7 +297,7 @@ def format_result(msg, no_colors=False, use_indent=False, use_full_testname=Fals
         _test = color_test_name(basename(msg["result_test"]), no_colors=no_colors)
 
     if use_indent is False:
-        _indent = indent * (msg["test_id"].count('/') - 1)
+        _indent = get_indent(msg["test_id"].count('/') - 1)
     else:
         _indent = use_indent
 
@@ -307,37 +319,49 @@ def format_result(msg, no_colors=False, use_indent=False, use_full_testname=Fals
             out += f" {_color(msg['result_reason'], no_colors=no_colors)}"
     return out + "\n"
 
-formatters = {
-    Message.INPUT.name: (format_input, f""),
-    Message.PROMPT.name: (format_prompt, f""),
-    Message.TEST.name: (format_test, f"", tests_by_parent, tests_by_id),
-    Message.RESULT.name: (format_result,),
-    Message.ATTRIBUTE.name: (format_attribute,),
-    Message.ARGUMENT.name: (format_argument,),
-    Message.SPECIFICATION.name: (format_specification,),
-    Message.REQUIREMENT.name: (format_requirement,),
-    Message.TAG.name: (format_tag,),
-    Message.EXAMPLE.name: (format_example,)
-}
+#: formatters indexed by message keyword value
+formatters = [None] * (max(Message) + 1)
+formatters[Message.INPUT] = (format_input, f"")
+formatters[Message.PROMPT] = (format_prompt, f"")
+formatters[Message.TEST] = (format_test, f"", tests_by_parent, tests_by_id)
+formatters[Message.RESULT] = (format_result,)
+formatters[Message.ATTRIBUTE] = (format_attribute,)
+formatters[Message.ARGUMENT] = (format_argument,)
+formatters[Message.SPECIFICATION] = (format_specification,)
+formatters[Message.REQUIREMENT] = (format_requirement,)
+formatters[Message.TAG] = (format_tag,)
+formatters[Message.EXAMPLE] = (format_example,)
 
 def transform(no_colors=False, show_input=True):
     """Transform parsed log line into a short format.
     """
+    # bind hot names to locals to avoid
+    # repeated global lookups per message
+    _formatters = formatters
+    _message_value = message_value
+    _format_input = format_input
+    _Flags = Flags
+    _last_message = last_message
+
     line = None
     while True:
         if line is not None:
             msg = line
-            formatter = formatters.get(line["message_keyword"], None)
-            if formatter:
-                if formatter[0] is format_input and show_input is False:
-                    line = None
-                else:
-                    flags = Flags(line["test_flags"])
-                    if flags & SKIP and settings.show_skipped is False:
+            # drop skipped messages before any formatter dispatch
+            # using raw flag bits without constructing Flags
+            flags = line["test_flags"]
+            if type(flags) is not int:
+                flags = int(_Flags(flags))
+            if flags & SKIP and settings.show_skipped is False:
+                line = None
+            else:
+                formatter = _formatters[_message_value(line["message_keyword"])]
+                if formatter:
+                    if formatter[0] is _format_input and show_input is False:
                         line = None
                     else:
                         line = formatter[0](line, *formatter[1:], no_colors=no_colors)
-                        last_message[0] = msg
-            else:
-                line = None
+                        _last_message[0] = msg
+                else:
+                    line = None
         line = yield line
@@ -0,0 +1,77 @@
+# Copyright 2020 Katteli Inc.
+# TestFlows.com Open-Source Software Testing Framework (http://testflows.com)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import re
+
+whitespace_only_pattern = re.compile(r"(?m)^[ \t]+$")
+leading_whitespace_pattern = re.compile(r"(?m)^([ \t]*)(?=[^ \t\n])")
+
+def dedent(text):
+    """Remove common leading whitespace from all lines.
+    Same as textwrap.dedent but uses precompiled patterns.
+    """
+    text = whitespace_only_pattern.sub("", text)
+    margins = leading_whitespace_pattern.findall(text)
+    if not margins:
+        return text
+
+    margin = margins[0]
+    for other in margins[1:]:
+        if not margin:
+            break
+        if other.startswith(margin):
+            continue
+        elif margin.startswith(other):
+            margin = other
+        else:
+            for i, (x, y) in enumerate(zip(margin, other)):
+                if x != y:
+                    margin = margin[:i]
+                    break
+
+    if margin:
+        width = len(margin)
+        text = "\n".join([line[width:] if line.startswith(margin) else line
+            for line in text.split("\n")])
+    return text
+
+def indent(text, prefix):
+    """Add prefix to all lines that are not whitespace-only.
+    Same as textwrap.indent but without per-line predicate calls.
+    """
+    if not prefix:
+        return text
+    return "\n".join([prefix + line if line and not line.isspace() else line
+        for line in text.split("\n")])
+
+def multiline_reindent(text, prefix=None):
+    """Reformat multiline text by stripping the first line,
+    dedenting the rest and optionally reindenting all lines
+    with the given prefix.
+    """
+    if "\n" not in text:
+        # fast path for single line text that needs
+        # no dedenting and at most a prefix
+        out = text.strip()
+        if prefix and out:
+            out = prefix + out
+        return out
+    first, rest = (text.rstrip() + "\n").split("\n", 1)
+    first = first.strip()
+    if first:
+        first += "\n"
+    out = f"{first}{dedent(rest.rstrip())}".rstrip()
+    if prefix:
+        out = indent(out, prefix)
+    return out